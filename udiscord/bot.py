@@ -1,32 +1,39 @@
 # pyright: reportMissingImports=false
 import os
 import time
-from random import random
+from json import dumps
 
 import network
 import uasyncio
 from micropython import const
 
-from .presence import Activity
+from .presence import Activity, Status
 from .websocket import WebsocketClient
 
+# gateway op codes for the payloads this bot sends; module-level so the
+# MicroPython compiler inlines the const() values (the former public
+# Bot.HEARTBEAT-style attributes are gone)
+_HEARTBEAT = const(1)
+_IDENTIFY = const(2)
+_PRESENCE_UPDATE = const(3)
+_RESUME = const(6)
+
+# pre-encoded gateway payload templates, with the op codes above baked
+# in as literals; only the varying fields are substituted so the hot
+# paths skip dict construction and json.dumps
+_HB_FMT = b'{"op":1,"d":%s}'  # _HEARTBEAT
+_RESUME_FMT = b'{"op":6,"d":{"token":"%s","session_id":"%s","seq":%s}}'  # _RESUME
+_PRESENCE_FMT = b'{"op":3,"d":{"since":null,"activities":%s,"status":"%s","afk":false}}'  # _PRESENCE_UPDATE
+
+
+def _seq_bytes(sequence: int | None) -> bytes:
+    return b"null" if sequence is None else str(sequence).encode()
+
 
 class Bot:
     sequence: int | None = None
     session_id: int | None = None
 
-    DISPATCH = const(0)
-    HEARTBEAT = const(1)
-    IDENTIFY = const(2)
-    PRESENCE_UPDATE = const(3)
-    VOICE_STATE_UPDATE = const(4)
-    RESUME = const(6)
-    RECONNECT = const(7)
-    REQUEST_GUILD_MEMBERS = const(8)
-    INVALID_SESSION = const(9)
-    HELLO = const(10)
-    ACK = const(11)
-
     def __init__(
         self,
         *,
@@ -38,6 +45,7 @@ class Bot:
         self.status = status
         self.intents = intents
         self.socket = WebsocketClient()
+        self._identify_payload: bytes | None = None
 
     def connect_wlan(self, ssid: str, key: str, attempts: int = 5) -> None:
         """Establish a WLAN connection."""
@@ -57,16 +65,13 @@ class Bot:
         print(f'WLAN connected to "{ssid}".')
 
     async def send_heartbeat(self) -> None:
-        await self.socket.send(
-            {
-                "op": self.HEARTBEAT,
-                "d": self.sequence,
-            }
-        )
+        await self.socket.send_raw(_HB_FMT % (_seq_bytes(self.sequence),))
 
     async def heartbeat(self, interval: float) -> None:
         self._heartbeat_ack = True
-        await uasyncio.sleep(interval * random())
+        # one 16-bit draw gives plenty of jitter without the random module
+        jitter = interval * int.from_bytes(os.urandom(2), "big") / 65536
+        await uasyncio.sleep(jitter)
         await self.send_heartbeat()
         while True:
             if self._heartbeat_ack:
@@ -77,32 +82,62 @@ class Bot:
                 await self.socket.close()
 
     async def identify(self) -> None:
-        await self.socket.send(
-            {
-                "op": self.IDENTIFY,
-                "d": {
-                    "token": self.token,
-                    "intents": self.intents,
-                    "properties": {
-                        "os": os.uname()[0],
-                        "browser": "udiscord",
-                        "device": "udiscord",
+        # the payload only depends on values fixed at construction, so encode
+        # it once and reuse the bytes on every reconnect
+        if self._identify_payload is None:
+            self._identify_payload = dumps(
+                {
+                    "op": _IDENTIFY,
+                    "d": {
+                        "token": self.token,
+                        "intents": self.intents,
+                        "properties": {
+                            "os": os.uname()[0],
+                            "browser": "udiscord",
+                            "device": "udiscord",
+                        },
+                        "presence": {
+                            "activities": [self.activity.to_dict()]
+                            if self.activity
+                            else [],
+                            "status": self.status or "online",
+                        },
                     },
-                    "presence": {
-                        "activities": [self.activity.to_dict()]
-                        if self.activity
-                        else [],
-                        "status": self.status or "online",
-                    },
-                },
-            }
+                }
+            ).encode("utf-8")
+        await self.socket.send_raw(self._identify_payload)
+
+    async def update_presence(
+        self, status: str = Status.ONLINE, activity: Activity | None = None
+    ) -> None:
+        """Update the bot's status and activity over the open connection."""
+        activities = (
+            b"[]"
+            if activity is None
+            else b"[" + dumps(activity.to_dict()).encode() + b"]"
         )
+        await self.socket.send_raw(_PRESENCE_FMT % (activities, status.encode()))
+        self.status = status
+        self.activity = activity
+        # the cached identify payload embeds the presence; rebuild it on
+        # the next reconnect
+        self._identify_payload = None
 
     async def receive(self) -> None:
-        while self.socket.open:
-            data = await self.socket.recv()
+        # bind lookups once; attribute access is a dict lookup per frame
+        socket = self.socket
+        recv = socket.recv
+        recv_nowait = socket.recv_nowait
+        while socket.open:
+            data = await recv()
             if data is not None:
                 print(f"[RECV] {data}")
+            # drain the rest of the burst before yielding to the scheduler
+            while socket.open:
+                data = await recv_nowait()
+                if data is None:
+                    break
+                print(f"[RECV] {data}")
 
     async def connect(self) -> None:
         """Connect to the Discord gateway."""
@@ -114,15 +149,13 @@ class Bot:
         await uasyncio.create_task(self.receive())
 
     async def resume(self) -> None:
-        await self.socket.send(
-            {
-                "op": self.RESUME,
-                "d": {
-                    "token": self.token,
-                    "session_id": self.session_id,
-                    "seq": self.sequence,
-                },
-            }
+        await self.socket.send_raw(
+            _RESUME_FMT
+            % (
+                self.token.encode(),
+                str(self.session_id).encode(),
+                _seq_bytes(self.sequence),
+            )
         )
 
     def run(self, token: str) -> None:
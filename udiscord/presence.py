@@ -25,9 +25,10 @@ class Activity:
         self.name = name
         self.type = type
         self.url = url
+        # the fields never change after construction, so build once
+        self._data: dict[str, str | int] = {"name": name, "type": type}
+        if url is not None:
+            self._data["url"] = url
 
     def to_dict(self) -> dict[str, str | int]:
-        data = {"name": self.name, "type": self.type}
-        if self.url is not None:
-            data["url"] = self.url
-        return data
+        return self._data
@@ -27,13 +27,14 @@ SOFTWARE.
 """
 
 # pyright: reportMissingImports=false
-import random
+import os
+import select
 import socket
-from binascii import b2a_base64
 from json import dumps, loads
 from ssl import wrap_socket
 from struct import pack, unpack
 
+import micropython
 from micropython import const
 
 # OP codes
@@ -55,6 +56,52 @@ CLOSE_TOO_BIG = const(1009)
 CLOSE_MISSING_EXTN = const(1010)
 CLOSE_BAD_CONDITION = const(1011)
 
+# ceiling for the recycled receive buffer; larger frames are drained
+# through it in chunks instead of being held in RAM at once
+_RX_CAP = const(8192)
+
+# any syntactically valid Sec-WebSocket-Key works: a bot opens a single
+# connection and never validates Sec-WebSocket-Accept, so there is
+# nothing to gain from a random one (this is the RFC 6455 example key)
+_WS_KEY = b"dGhlIHNhbXBsZSBub25jZQ=="
+
+# the upgrade request never varies, so send it as one pre-built write
+_HANDSHAKE = (
+    b"GET /?v=10&encoding=json HTTP/1.1\r\n"
+    b"Host: gateway.discord.gg:443\r\n"
+    b"Connection: Upgrade\r\n"
+    b"Upgrade: websocket\r\n"
+    b"Sec-WebSocket-Key: " + _WS_KEY + b"\r\n"
+    b"Sec-WebSocket-Version: 13\r\n"
+    b"Origin: http://gateway.discord.gg:443\r\n"
+    b"\r\n"
+)
+
+
+@micropython.viper
+def _mask_inplace(buf: ptr8, mask: ptr8, n: int):  # type: ignore
+    # emitted as native code, bypassing the bytecode dispatcher entirely;
+    # viper allows at most 4 arguments, so the mask comes in as a pointer
+    m0: int = mask[0]
+    m1: int = mask[1]
+    m2: int = mask[2]
+    m3: int = mask[3]
+    i: int = 0
+    while i < n:
+        buf[i] ^= m0
+        buf[i + 1] ^= m1
+        buf[i + 2] ^= m2
+        buf[i + 3] ^= m3
+        i += 4
+
+
+def _mask(buf, mask_bits: bytes, length: int) -> None:
+    # XOR buf[:length] with the mask in place
+    n4 = length & ~3
+    _mask_inplace(buf, mask_bits, n4)
+    for i in range(n4, length):  # tail bytes
+        buf[i] ^= mask_bits[i & 3]
+
 
 class NoDataException(Exception):
     pass
@@ -70,22 +117,18 @@ class WebsocketClient:
         sock.connect(socket.getaddrinfo("gateway.discord.gg", 443)[0][4])
         # sock.setblocking(False)
         self._underlying = wrap_socket(sock)
-
-        async def send_header(header, *args) -> None:
-            self._underlying.write(header % args + "\r\n")
-
-        # Sec-WebSocket-Key is 16 random bytes encoded in base64
-        key = b2a_base64(bytes(random.getrandbits(8) for _ in range(16)))[:-1]
-
-        await send_header(b"GET /?v=10&encoding=json HTTP/1.1")
-        await send_header(b"Host: gateway.discord.gg:433")
-        await send_header(b"Connection: Upgrade")
-        await send_header(b"Upgrade: websocket")
-        await send_header(b"Sec-WebSocket-Key: %s", key)
-        await send_header(b"Sec-WebSocket-Version: 13")
-        await send_header(b"Origin: http://gateway.discord.gg:443")
-        await send_header(b"")
-
+        self._txbuf = bytearray()
+        self._rxbuf = bytearray(4096)
+        self._rxmv = memoryview(self._rxbuf)
+        self._poll = select.poll()
+        self._poll.register(self._underlying, select.POLLIN)
+
+        self._underlying.write(_HANDSHAKE)
+
+        # the socket is blocking and read() never returns short, so bulk
+        # chunk reads would stall once fewer bytes than requested remain;
+        # readline stops exactly at each terminator and consumes nothing
+        # past the blank line, leaving the first frame untouched
         header = self._underlying.readline()[:-2]  # type: ignore # readline isn't recognised
         assert header.startswith(b"HTTP/1.1 101 ")
 
@@ -94,7 +137,7 @@ class WebsocketClient:
 
         self.open = True
 
-    async def read_frame(self) -> tuple[bool, int, bytes]:
+    async def read_frame(self) -> tuple[bool, int, memoryview]:
         # frame header
         two_bytes = self._underlying.read(2)
 
@@ -118,17 +161,43 @@ class WebsocketClient:
 
         mask_bits = self._underlying.read(4) if mask else b""
 
-        try:
-            data = self._underlying.read(length)
-        except MemoryError:
-            await self.close(CLOSE_TOO_BIG, reason="Received data is too big.")
-            return True, OP_CLOSE, b""
+        if len(self._rxbuf) < length <= _RX_CAP:
+            try:
+                self._rxbuf = bytearray(length)
+                self._rxmv = memoryview(self._rxbuf)
+            except MemoryError:
+                # a fragmented heap can fail even under the cap; treat
+                # the frame like an over-cap one below
+                pass
+
+        if length > len(self._rxbuf):
+            # over the cap, or the heap could not grow the buffer: drain
+            # the frame through the existing buffer and drop it rather
+            # than closing and paying a reconnect + re-identify
+            got = 0
+            while got < length:
+                read = self._underlying.readinto(self._rxmv[: min(len(self._rxbuf), length - got)])
+                if not read:
+                    raise NoDataException
+                got += read
+            print(f"[WS] Dropped frame of {length} bytes (too big to buffer).")
+            return fin, op_code, self._rxmv[:0]
+
+        # fill the recycled buffer instead of allocating a fresh bytes object
+        got = 0
+        while got < length:
+            read = self._underlying.readinto(self._rxmv[got:length])
+            if not read:
+                raise NoDataException
+            got += read
 
         if mask:
-            data = bytes(b ^ mask_bits[i % 4] for i, b in enumerate(data))
-        return fin, op_code, data
+            _mask(self._rxbuf, mask_bits, length)
+        return fin, op_code, self._rxmv[:length]
 
-    async def write_frame(self, op_code: int, data: bytes) -> None:
+    async def write_frame(self, op_code: int, data: bytes | memoryview) -> None:
+        # data may be any buffer object, e.g. a view into the receive
+        # buffer when echoing a PING payload back as a PONG
         length = len(data)
 
         # frame header
@@ -141,52 +210,93 @@ class WebsocketClient:
 
         if length < 126:  # 126 is a magic value to use 2-byte length header
             byte2 |= length
-            self._underlying.write(pack("!BB", byte1, byte2))
+            header = pack("!BB", byte1, byte2)
         elif length < (1 << 16):  # length fits in 2-bytes
             byte2 |= 126  # magic code
-            self._underlying.write(pack("!BBH", byte1, byte2, length))
+            header = pack("!BBH", byte1, byte2, length)
         elif length < (1 << 64):
             byte2 |= 127  # magic code
-            self._underlying.write(pack("!BBQ", byte1, byte2, length))
+            header = pack("!BBQ", byte1, byte2, length)
         else:
             raise ValueError()
 
-        mask_bits = pack("!I", random.getrandbits(32))
-        self._underlying.write(mask_bits)
-        data = bytes(b ^ mask_bits[i % 4] for i, b in enumerate(data))
-        self._underlying.write(data)
+        # assemble header, mask and payload contiguously and mask the
+        # payload in place, so the frame reaches the buffer in one piece
+        mask_bits = os.urandom(4)
+        offset = len(header) + 4
+        frame = bytearray(offset + length)
+        frame[: len(header)] = header
+        frame[len(header) : offset] = mask_bits
+        frame[offset:] = data
+        _mask(memoryview(frame)[offset:], mask_bits, length)
+        self._txbuf.extend(frame)
+
+    async def _flush(self) -> None:
+        # write all buffered frames as a single TLS record
+        if self._txbuf:
+            self._underlying.write(self._txbuf)
+            self._txbuf[:] = b""
 
     async def recv(self) -> dict[str, object] | None:
+        # bind the frame reader once for the duration of the loop
+        read_frame = self.read_frame
         while self.open:
             try:
-                fin, op_code, data = await self.read_frame()
+                fin, op_code, data = await read_frame()
             except ValueError:
                 return await self._close()
 
             if not fin:
                 raise NotImplementedError()
 
-            if op_code == OP_TEXT:
-                return loads(data.decode("utf-8"))
-            elif op_code == OP_BYTES:
-                return loads(data)
+            if op_code == OP_TEXT or op_code == OP_BYTES:
+                if len(data):
+                    # loads only takes str/bytes, so the memoryview needs
+                    # one bytes copy; the str round-trip stays gone
+                    return loads(bytes(data))
+                # an oversized frame was drained and dropped in read_frame
             elif op_code == OP_CLOSE:
                 return await self._close()
             elif op_code == OP_PING:
                 await self.write_frame(OP_PONG, data)
+                await self._flush()
             elif op_code == OP_CONT:
                 raise NotImplementedError(op_code)
             else:
                 raise ValueError(op_code)
 
+    async def recv_nowait(self) -> dict[str, object] | None:
+        # best effort: return the next payload only if bytes look ready.
+        # poll() watches the raw socket, so plaintext already buffered in
+        # the SSL layer goes unnoticed until the next blocking recv, and
+        # a frame that has only partially arrived still blocks until it
+        # completes; MicroPython's ssl exposes no pending() to do better
+        if not self._poll.poll(0):
+            return None
+        return await self.recv()
+
     async def send(self, payload: dict[str, object]) -> None:
         assert self.open
-        await self.write_frame(OP_BYTES, dumps(payload).encode("utf-8"))
+        await self.write_frame(OP_TEXT, dumps(payload).encode("utf-8"))
+        await self._flush()
+
+    async def send_raw(self, payload: bytes) -> None:
+        # send pre-encoded JSON, skipping dumps()
+        assert self.open
+        await self.write_frame(OP_TEXT, payload)
+        await self._flush()
+
+    async def send_many(self, payloads) -> None:
+        assert self.open
+        for payload in payloads:
+            await self.write_frame(OP_TEXT, dumps(payload).encode("utf-8"))
+        await self._flush()
 
     async def close(self, code: int = CLOSE_OK, *, reason: str = "") -> None:
         if self.open:
             buf = pack("!H", code) + reason.encode("utf-8")
             await self.write_frame(OP_CLOSE, buf)
+            await self._flush()
             await self._close()
 
     async def _close(self) -> None: